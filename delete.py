@@ -1,8 +1,110 @@
 import os
+import re
 import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-def delete_images_after_embedding(folder_path=None):
+# Image files (common formats)
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp', '.tiff'})
+
+# File kind by lowercase extension, for the folder scan
+OPUS, IMAGE = 'opus', 'image'
+FILE_KINDS = {'.opus': OPUS, **dict.fromkeys(IMAGE_EXTENSIONS, IMAGE)}
+
+# Upper bound for concurrent deletions when no worker count is given
+MAX_DELETE_WORKERS = 32
+
+# Largest number of files handed to a worker in one submission
+DELETE_BATCH_SIZE = 256
+
+def delete_batch(folder_path, names, dir_fd=None):
+    """
+    Delete a batch of files, returning (name, error) for each one
+    """
+    results = []
+    for name in names:
+        try:
+            if dir_fd is not None:
+                # Relative to the open folder, so the path is not walked again
+                os.unlink(name, dir_fd=dir_fd)
+            else:
+                os.remove(os.path.join(folder_path, name))
+            results.append((name, None))
+        except Exception as e:
+            results.append((name, e))
+    return results
+
+def print_lines(lines):
+    """
+    Write a block of lines to stdout in a single call
+    """
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+def _stem_lower(name):
+    """
+    Lowercase file name without its extension
+    """
+    i = name.rfind('.')
+    return name[:i].lower() if i > 0 else name.lower()
+
+def build_opus_index(opus_basenames):
+    """
+    Precompile the lookups used to match image names against OPUS base names
+    """
+    # "OPUS name inside image name": one alternation, longest names first
+    pattern = None
+    if opus_basenames:
+        pattern = re.compile("|".join(sorted(map(re.escape, opus_basenames), key=len, reverse=True)))
+    
+    # "Image name inside OPUS name": one NUL-separated string of all OPUS names
+    haystack = "\0" + "\0".join(sorted(opus_basenames)) + "\0"
+    
+    return opus_basenames, pattern, haystack
+
+def find_matching_opus(img_basename, opus_index):
+    """
+    Return the OPUS base name an image belongs to, or None if there is no match
+    """
+    opus_basenames, pattern, haystack = opus_index
+    
+    # Fast path: cover art named exactly like the song
+    if img_basename in opus_basenames:
+        return img_basename
+    
+    # Fallback: more flexible substring matching, one C-level scan per direction
+    if pattern:
+        match = pattern.search(img_basename)
+        if match:
+            return match.group()
+    
+    pos = haystack.find(img_basename)
+    if pos >= 0:
+        start = haystack.rfind("\0", 0, pos) + 1
+        end = haystack.find("\0", pos + len(img_basename))
+        return haystack[start:end]
+    
+    return None
+
+def _classify(image_files, opus_files):
+    """
+    Split images into ([(image, matching OPUS base name)], [unmatched images])
+    """
+    opus_index = build_opus_index({_stem_lower(f) for f in opus_files})
+    
+    matching = []
+    non_matching = []
+    for img in image_files:
+        match = find_matching_opus(_stem_lower(img), opus_index)
+        if match is not None:
+            matching.append((img, match))
+        else:
+            non_matching.append(img)
+    
+    return matching, non_matching
+
+def delete_images_after_embedding(folder_path=None, max_workers=None):
     """
     Delete image files after verifying all OPUS files have embedded artwork
     """
@@ -22,18 +124,22 @@ def delete_images_after_embedding(folder_path=None):
     
     print(f"[*] Scanning folder: {folder_path}")
     
-    # Get all files
-    all_files = os.listdir(folder_path)
-    
-    # Filter for OPUS files
-    opus_files = [f for f in all_files if f.lower().endswith('.opus')]
-    
-    # Filter for image files (common formats)
-    image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp', '.tiff']
-    image_files = [
-        f for f in all_files 
-        if any(f.lower().endswith(ext) for ext in image_extensions)
-    ]
+    # Classify OPUS and image files in a single directory pass
+    opus_files = []
+    image_files = []
+    get_kind = FILE_KINDS.get
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            # Only the suffix is lowercased, not the whole name
+            name = entry.name
+            i = name.rfind('.')
+            kind = get_kind(name[i:].lower()) if i > 0 else None
+            if kind is None or not entry.is_file(follow_symlinks=False):
+                continue
+            if kind is OPUS:
+                opus_files.append(name)
+            else:
+                image_files.append(name)
     
     print(f"[*] Found {len(opus_files)} .opus files")
     print(f"[*] Found {len(image_files)} image files")
@@ -43,9 +149,11 @@ def delete_images_after_embedding(folder_path=None):
         return
     
     # Display found images
+    # Sort once; every list derived from image_files below keeps this order
+    image_files.sort()
+    
     print("\n[*] Image files found:")
-    for img in sorted(image_files):
-        print(f"    - {img}")
+    print_lines([f"    - {img}" for img in image_files])
     
     # Option 1: Delete all images
     # Option 2: Delete only images that match OPUS filenames
@@ -60,8 +168,9 @@ def delete_images_after_embedding(folder_path=None):
         print("[*] Operation cancelled")
         return
     
-    # Get base names for matching
-    opus_basenames = {os.path.splitext(f)[0].lower() for f in opus_files}
+    # Options 2 and 3 share one classification pass
+    if choice in ("2", "3"):
+        matching_images, non_matching_images = _classify(image_files, opus_files)
     
     if choice == "1":
         # Delete all images
@@ -70,20 +179,7 @@ def delete_images_after_embedding(folder_path=None):
     
     elif choice == "2":
         # Delete only images that match OPUS filenames
-        files_to_delete = []
-        for img in image_files:
-            img_basename = os.path.splitext(img)[0].lower()
-            
-            # Check if this image name matches any OPUS file
-            # More flexible matching
-            matches = [
-                opus for opus in opus_basenames 
-                if img_basename in opus or opus in img_basename
-            ]
-            
-            if matches:
-                files_to_delete.append(img)
-        
+        files_to_delete = [img for img, _ in matching_images]
         condition = "matching OPUS files only"
     
     elif choice == "3":
@@ -92,28 +188,13 @@ def delete_images_after_embedding(folder_path=None):
         print("     DRY RUN - NO FILES WILL BE DELETED")
         print("=" * 50)
         
-        # Check matching images
-        matching_images = []
-        non_matching_images = []
-        
-        for img in image_files:
-            img_basename = os.path.splitext(img)[0].lower()
-            matches = [opus for opus in opus_basenames if img_basename in opus or opus in img_basename]
-            
-            if matches:
-                matching_images.append((img, matches[0]))
-            else:
-                non_matching_images.append(img)
-        
         if matching_images:
             print("\n[*] Images that WOULD be deleted (matching OPUS files):")
-            for img, match in sorted(matching_images):
-                print(f"    ✓ {img} → matches {match}.opus")
+            print_lines([f"    ✓ {img} → matches {match}.opus" for img, match in matching_images])
         
         if non_matching_images:
             print("\n[*] Images that would NOT be deleted (no matching OPUS):")
-            for img in sorted(non_matching_images):
-                print(f"    ✗ {img}")
+            print_lines([f"    ✗ {img}" for img in non_matching_images])
         
         print(f"\n[*] Total images that would be deleted: {len(matching_images)}")
         print("[*] This was a dry run. No files were deleted.")
@@ -130,8 +211,7 @@ def delete_images_after_embedding(folder_path=None):
     # Confirm deletion
     print(f"\n[*] About to delete {len(files_to_delete)} image files ({condition})")
     print("\nFiles to be deleted:")
-    for img in sorted(files_to_delete):
-        print(f"    - {img}")
+    print_lines([f"    - {img}" for img in files_to_delete])
     
     confirm = input("\nAre you sure you want to delete these files? (y/n): ").strip().lower()
     
@@ -143,15 +223,39 @@ def delete_images_after_embedding(folder_path=None):
     deleted_count = 0
     error_count = 0
     
-    for img in files_to_delete:
-        try:
-            file_path = os.path.join(folder_path, img)
-            os.remove(file_path)
-            print(f"[✓] Deleted: {img}")
-            deleted_count += 1
-        except Exception as e:
-            print(f"[!] Error deleting {img}: {e}")
-            error_count += 1
+    # Unlink in parallel batches; results are collected and printed once at the end
+    result_lines = []
+    workers = max_workers or min(MAX_DELETE_WORKERS, len(files_to_delete))
+    batch_size = min(DELETE_BATCH_SIZE, -(-len(files_to_delete) // workers))
+    batches = [
+        files_to_delete[i:i + batch_size]
+        for i in range(0, len(files_to_delete), batch_size)
+    ]
+    
+    # Open the folder once and share the descriptor (not available on Windows)
+    dir_fd = None
+    if os.unlink in os.supports_dir_fd:
+        dir_fd = os.open(folder_path, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+    
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(delete_batch, folder_path, batch, dir_fd)
+                for batch in batches
+            ]
+            for future in as_completed(futures):
+                for img, error in future.result():
+                    if error is None:
+                        result_lines.append(f"[✓] Deleted: {img}")
+                        deleted_count += 1
+                    else:
+                        result_lines.append(f"[!] Error deleting {img}: {error}")
+                        error_count += 1
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+    
+    print_lines(result_lines)
     
     # Summary
     print("\n" + "=" * 50)
@@ -159,10 +263,21 @@ def delete_images_after_embedding(folder_path=None):
     print("=" * 50)
     print(f"[*] Total images deleted: {deleted_count}")
     print(f"[*] Errors: {error_count}")
-    print(f"[*] Remaining files in folder: {len(os.listdir(folder_path))}")
+    with os.scandir(folder_path) as entries:
+        remaining = sum(1 for _ in entries)
+    print(f"[*] Remaining files in folder: {remaining}")
     print("=" * 50)
 
-def main():
+def positive_int(value):
+    """
+    argparse type for counts that must be at least 1
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def main(max_workers=None):
     print("=" * 50)
     print("     OPUS IMAGE CLEANUP TOOL")
     print("=" * 50)
@@ -173,9 +288,9 @@ def main():
     choice = input("\nSelect option: ").strip()
     
     if choice == "1":
-        delete_images_after_embedding()
+        delete_images_after_embedding(max_workers=max_workers)
     elif choice == "2":
-        delete_images_after_embedding(os.getcwd())
+        delete_images_after_embedding(os.getcwd(), max_workers=max_workers)
     elif choice == "0":
         print("[*] Goodbye!")
         sys.exit(0)
@@ -183,6 +298,11 @@ def main():
         print("[!] Invalid choice")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='OPUS Image Cleanup Tool')
+    parser.add_argument('--workers', '-w', type=positive_int, default=None,
+                        help=f'Number of parallel deletions (default: up to {MAX_DELETE_WORKERS})')
+    args = parser.parse_args()
+    
     while True:
-        main()
+        main(args.workers)
         print()
\ No newline at end of file
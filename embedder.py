@@ -1,60 +1,136 @@
 #!/usr/bin/env python3
 import os
+import sys
 import re
+import io
+import base64
+import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor
 from mutagen.oggopus import OggOpus
 from mutagen.flac import Picture
 from PIL import Image
 from pathlib import Path
 
-SUPPORTED_COVERS = (".jpg", ".jpeg", ".png")
+SUPPORTED_COVERS = (".jpg", ".jpeg", ".png")  # In order of preference
+COVER_EXTENSIONS = frozenset(SUPPORTED_COVERS)
+COVER_MIME_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}
+COMMON_COVERS = ("cover.jpg", "cover.jpeg", "cover.png", "album.jpg", "folder.jpg")
+
+# Spare room reserved in the tag block when a cover no longer fits in place
+COVER_PADDING = 64 * 1024
+
+# JPEG start-of-frame markers (exclude DHT, JPG and DAC which share the range)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# Channels per pixel for each PNG color type
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+def get_image_info(data):
+    """Read (width, height, depth) from PNG/JPEG header bytes, or None if unknown"""
+    # PNG: IHDR is always the first chunk
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 26:
+        width = int.from_bytes(data[16:20], "big")
+        height = int.from_bytes(data[20:24], "big")
+        depth = data[24] * PNG_CHANNELS.get(data[25], 1)
+        return width, height, depth
+    
+    # JPEG: walk the segments until a start-of-frame marker
+    if data[:2] == b"\xff\xd8":
+        pos = 2
+        while pos + 9 < len(data):
+            if data[pos] != 0xFF:
+                return None
+            marker = data[pos + 1]
+            if marker == 0xFF:  # Fill byte
+                pos += 1
+                continue
+            if marker in JPEG_SOF_MARKERS:
+                height = int.from_bytes(data[pos + 5:pos + 7], "big")
+                width = int.from_bytes(data[pos + 7:pos + 9], "big")
+                depth = data[pos + 4] * data[pos + 9]  # Sample precision x components
+                return width, height, depth
+            pos += 2 + int.from_bytes(data[pos + 2:pos + 4], "big")
+    
+    return None
+
+@functools.lru_cache(maxsize=256)
+def _folder_index(folder):
+    """Scan a folder once, returning ({lowercase name: path}, common cover, first image)"""
+    covers = {}
+    first_image = None
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            # Check the suffix first; only covers get their full name lowercased
+            i = entry.name.rfind(".")
+            if i <= 0 or entry.name[i:].lower() not in COVER_EXTENSIONS or not entry.is_file():
+                continue
+            covers[entry.name.lower()] = entry.path
+            if first_image is None:
+                first_image = entry.path
+    
+    common_cover = next((covers[name] for name in COMMON_COVERS if name in covers), None)
+    return covers, common_cover, first_image
 
 def find_cover_for_song(song_file_path):
     """Find cover art with same base name as song file"""
     song_path = Path(song_file_path)
-    base_name = song_path.stem  # Get filename without extension
+    base_name = song_path.stem.lower()  # Get filename without extension
     
-    # Look for cover files with same base name
-    folder = song_path.parent
+    # Folder listings are cached, so songs sharing a folder scan it only once
+    covers, common_cover, first_image = _folder_index(str(song_path.parent))
     
+    # Look for cover files with same base name
     for ext in SUPPORTED_COVERS:
-        cover_path = folder / f"{base_name}{ext}"
-        if cover_path.exists():
-            return str(cover_path)
-    
-    # Alternative: Look for common cover filenames
-    common_covers = ["cover.jpg", "cover.jpeg", "cover.png", "album.jpg", "folder.jpg"]
-    for cover_name in common_covers:
-        cover_path = folder / cover_name
-        if cover_path.exists():
-            return str(cover_path)
-    
-    # Search for any image file in the folder
-    for file in folder.iterdir():
-        if file.suffix.lower() in SUPPORTED_COVERS:
-            return str(file)
+        cover_path = covers.get(f"{base_name}{ext}")
+        if cover_path:
+            return cover_path
     
-    return None
+    # Alternative: Look for common cover filenames, then any image in the folder
+    return common_cover or first_image
+
+def keep_tag_padding(info):
+    """Keep the tag block size when the new tags fit, so only the header is rewritten"""
+    if info.padding >= 0:
+        return info.padding
+    return COVER_PADDING
+
+@functools.lru_cache(maxsize=16)
+def _read_cover(cover_path, mtime_ns, size, trust_headers):
+    """Read cover bytes and picture fields; mtime/size make the cache key change with the file"""
+    # Read cover image once; everything below works on these bytes
+    cover_data = Path(cover_path).read_bytes()
+    
+    # Determine MIME type from extension
+    cover_ext = os.path.splitext(cover_path)[1].lower()
+    mime = COVER_MIME_TYPES.get(cover_ext, "image/jpeg")
+    
+    # Get image size and color depth from the header, falling back to PIL.
+    # With trust_headers these advisory fields are written as 0 instead;
+    # players read the real values from the image itself.
+    image_info = (0, 0, 0) if trust_headers else get_image_info(cover_data)
+    if image_info:
+        width, height, depth = image_info
+    else:
+        with Image.open(io.BytesIO(cover_data)) as img:
+            # PIL reads size and mode from the header without decoding pixels
+            width, height = img.size
+            depth = len(img.getbands()) * 8
+    
+    return cover_data, mime, width, height, depth
 
-def embed_cover(opus_path, cover_path):
-    """Embed cover art into Opus file"""
+def load_cover(cover_path, trust_headers=False):
+    """Return (data, mime, width, height, depth) for a cover, cached per file version"""
+    st = os.stat(cover_path)
+    return _read_cover(str(cover_path), st.st_mtime_ns, st.st_size, trust_headers)
+
+def embed_cover(opus_path, cover_path, trust_headers=False):
+    """Embed cover art into Opus file, returning (success, status line)"""
     try:
         audio = OggOpus(opus_path)
         
-        # Read and process cover image
-        with open(cover_path, "rb") as f:
-            cover_data = f.read()
-        
-        # Determine MIME type from extension
-        cover_ext = os.path.splitext(cover_path)[1].lower()
-        if cover_ext == ".png":
-            mime = "image/png"
-        else:
-            mime = "image/jpeg"
-        
-        # Get image dimensions
-        with Image.open(cover_path) as img:
-            img = img.convert("RGB")  # Convert to RGB for compatibility
-            width, height = img.size
+        # Shared covers (e.g. one cover.jpg per album) are only read once
+        cover_data, mime, width, height, depth = load_cover(cover_path, trust_headers)
         
         # Create Picture metadata
         pic = Picture()
@@ -63,20 +139,37 @@ def embed_cover(opus_path, cover_path):
         pic.mime = mime
         pic.width = width
         pic.height = height
-        pic.depth = 24
+        pic.depth = depth
         
-        # Embed the picture
-        audio["metadata_block_picture"] = [pic.write().decode("latin1")]
-        audio.save()
+        # Embed the picture (Vorbis comments store the FLAC picture block as base64)
+        audio["metadata_block_picture"] = [base64.b64encode(pic.write()).decode("ascii")]
+        audio.save(padding=keep_tag_padding)
         
-        print(f"[✓] Embedded cover → {os.path.basename(opus_path)}")
-        return True
+        return True, f"[✓] Embedded cover → {os.path.basename(opus_path)}"
         
     except Exception as e:
-        print(f"[✗] Failed to embed cover for {os.path.basename(opus_path)}: {e}")
-        return False
+        return False, f"[✗] Failed to embed cover for {os.path.basename(opus_path)}: {e}"
+
+def _process_one(opus_path, trust_headers=False):
+    """Find and embed cover art for one Opus file, returning (status, output lines)"""
+    opus_file = Path(opus_path)
+    
+    # Find matching cover art
+    cover_path = find_cover_for_song(opus_file)
+    if not cover_path:
+        return "skipped", [
+            f"[!] No matching cover art found for: {opus_file.name}",
+            f"    Expected: {opus_file.stem}.jpg/.png/.jpeg",
+        ]
+    
+    # Embed the cover art
+    success, line = embed_cover(str(opus_file), cover_path, trust_headers)
+    return ("processed" if success else "failed"), [
+        f"[*] Found cover: {os.path.basename(cover_path)}",
+        line,
+    ]
 
-def batch_process(folder_path):
+def batch_process(folder_path, max_workers=None, trust_headers=False):
     """Process all Opus files in folder"""
     folder = Path(folder_path)
     
@@ -84,7 +177,11 @@ def batch_process(folder_path):
         print(f"[!] Folder not found: {folder_path}")
         return
     
-    opus_files = list(folder.glob("*.opus"))
+    opus_files = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False) and entry.name[-5:].lower() == ".opus":
+                opus_files.append(entry.path)
     
     if not opus_files:
         print(f"[!] No .opus files found in {folder_path}")
@@ -93,29 +190,33 @@ def batch_process(folder_path):
     print(f"[*] Found {len(opus_files)} .opus files")
     print(f"[*] Searching for matching cover art...")
     
+    # Drop folder listings cached by earlier runs before workers inherit them
+    _folder_index.cache_clear()
+    
     processed = 0
     skipped = 0
     failed = 0
     
-    for opus_file in opus_files:
-        print(f"\n[*] Processing: {opus_file.name}")
-        
-        # Find matching cover art
-        cover_path = find_cover_for_song(opus_file)
-        
-        if not cover_path:
-            print(f"[!] No matching cover art found for: {opus_file.name}")
-            print(f"    Expected: {opus_file.stem}.jpg/.png/.jpeg")
-            skipped += 1
-            continue
-        
-        print(f"[*] Found cover: {os.path.basename(cover_path)}")
-        
-        # Embed the cover art
-        if embed_cover(str(opus_file), cover_path):
-            processed += 1
-        else:
-            failed += 1
+    # Files are independent, so embed them in parallel worker processes.
+    # Workers return their output lines, which are written once at the end.
+    out_lines = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            functools.partial(_process_one, trust_headers=trust_headers),
+            opus_files,
+            chunksize=8
+        )
+        for status, lines in results:
+            out_lines.extend(lines)
+            if status == "processed":
+                processed += 1
+            elif status == "skipped":
+                skipped += 1
+            else:
+                failed += 1
+    
+    if out_lines:
+        sys.stdout.write("\n".join(out_lines) + "\n")
     
     # Summary
     print(f"\n{'='*50}")
@@ -137,7 +238,7 @@ def batch_process(folder_path):
         print("    2. Cover art should have same base name as the song")
         print("    3. Supported formats: .jpg, .jpeg, .png")
 
-def interactive_mode():
+def interactive_mode(trust_headers=False):
     """Interactive mode with menu"""
     while True:
         print("\n" + "="*50)
@@ -162,7 +263,7 @@ def interactive_mode():
                 print(f"[!] Folder not found: {folder}")
                 continue
             
-            batch_process(folder_path)
+            batch_process(folder_path, trust_headers=trust_headers)
             
         elif choice == "2":
             opus_file = input("\nEnter Opus file path: ").strip()
@@ -176,6 +277,7 @@ def interactive_mode():
                 continue
             
             print(f"\n[*] Processing single file: {opus_path.name}")
+            _folder_index.cache_clear()
             cover_path = find_cover_for_song(opus_path)
             
             if not cover_path:
@@ -190,7 +292,8 @@ def interactive_mode():
                     continue
             
             print(f"[*] Found cover: {os.path.basename(cover_path)}")
-            embed_cover(str(opus_path), cover_path)
+            _, line = embed_cover(str(opus_path), cover_path, trust_headers)
+            print(line)
             
         elif choice == "3":
             print("\n[*] EXPECTED FILENAME FORMAT:")
@@ -224,12 +327,15 @@ def interactive_mode():
             print("[!] Invalid choice")
 
 if __name__ == "__main__":
-    import sys
+    parser = argparse.ArgumentParser(description='Opus Cover Art Embedder')
+    parser.add_argument('folder', nargs='?', help='Folder of .opus files to process')
+    parser.add_argument('--trust-headers', action='store_true',
+                        help='Skip reading cover dimensions (written as 0)')
+    args = parser.parse_args()
     
-    if len(sys.argv) == 2:
+    if args.folder:
         # Command line mode: python script.py /path/to/folder
-        folder_path = sys.argv[1]
-        batch_process(folder_path)
+        batch_process(args.folder, trust_headers=args.trust_headers)
     else:
         # Interactive mode
-        interactive_mode()
\ No newline at end of file
+        interactive_mode(args.trust_headers)
\ No newline at end of file
@@ -3,29 +3,199 @@ import os
 import sys
 import re
 import json
+import mmap
+import atexit
+import functools
+from contextlib import contextmanager
 import subprocess
 from pathlib import Path
 import argparse
 from typing import List, Dict, Optional, Tuple
+import shlex
+import signal
 import time
 import shutil
+import threading
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from collections import deque
+import importlib.util
 import unicodedata
-import traceback
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import yt_dlp
+except ImportError:  # Installed on first run, or only present in the venv
+    yt_dlp = None
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:  # Optional faster parser; json.loads also accepts bytes
+    json_loads = json.loads
+
+try:
+    import mutagen
+except ImportError:  # Optional; without it yt-dlp embeds the tags itself
+    mutagen = None
+
+# Upper bound for URLs from a --file processed at the same time
+MAX_URL_WORKERS = 8
+
+# How long looked-up track info and playlist listings are reused across runs
+METADATA_CACHE_TTL = 24 * 60 * 60
+
+# Info fields the downloader reads; only these are kept in the metadata cache
+CACHED_INFO_KEYS = (
+    'id', 'title', 'artist', 'creator', 'uploader', 'description', 'album',
+    'playlist', 'playlist_title', 'track_number', 'release_year', 'release_date',
+    'genre', 'abr', 'asr', 'duration', 'webpage_url', 'original_url', 'extractor',
+)
+
+# Timestamp format used in the failed-downloads log
+LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Extensions yt-dlp may leave behind for an extracted audio file
+AUDIO_EXTENSIONS = ('.mp3', '.opus', '.m4a', '.webm', '.ogg')
+
+# Tag name written by ffmpeg for each metadata field
+FFMPEG_TAGS = {
+    'title': 'title',
+    'artist': 'artist',
+    'album': 'album',
+    'track_number': 'track',
+    'release_year': 'date',
+    'genre': 'genre',
+}
+
+# Same fields under mutagen's "easy" tag names
+EASY_TAGS = {
+    'title': 'title',
+    'artist': 'artist',
+    'album': 'album',
+    'track_number': 'tracknumber',
+    'release_year': 'date',
+    'genre': 'genre',
+}
+
+# Placeholders from extract_metadata that are not worth writing as tags
+UNKNOWN_VALUES = ('Unknown Title', 'Unknown Artist', 'Unknown Album')
+
+# Filename cleanup: invalid characters become '_', control characters are dropped
+_SANITIZE_TABLE = str.maketrans({**dict.fromkeys('<>:"/\\|?*', '_'), **dict.fromkeys(range(32))})
+_WS_RE = re.compile(r'\s+')
+
+# URL classification, each a single case-insensitive scan. The group that matches
+# names the platform; music.youtube.com starts before its youtube.com part
+_PLATFORM_RE = re.compile(
+    r'(?P<youtube_music>music\.youtube\.com)'
+    r'|(?P<youtube>youtube\.com|youtu\.be)'
+    r'|(?P<soundcloud>soundcloud\.com)'
+    r'|(?P<spotify>spotify\.com)'
+    r'|(?P<bandcamp>bandcamp\.com)'
+    r'|(?P<vimeo>vimeo\.com)',
+    re.IGNORECASE
+)
+_PLAYLIST_RE = re.compile(r'playlist|set/|album|list=', re.IGNORECASE)
+
+# yt-dlp output lines worth showing: progress (redrawn in place) and processing stages
+_PROGRESS_RE = re.compile(r'%|\[download\]')
+_STAGE_RE = re.compile(r'\[(?:ExtractAudio|ffmpeg|Metadata|(?i:soundcloud))\]')
+
+# yt-dlp separates progress updates with '\r' when writing to a pipe, so both end a line
+_LINE_END_RE = re.compile(rb'[\r\n]')
+
+# URL of a failed-downloads log entry: JSONL records (written with 'url' as the
+# first key, so group 1 is its JSON string) or legacy "URL: ..." lines (group 2)
+_FAILED_URL_RE = re.compile(rb'^(?:\{"url": ("(?:[^"\\\n]|\\.)*")|URL: ([^\r\n]*))', re.MULTILINE)
+
+# Messages from the download paths, which run on worker threads. They are queued
+# and written to stdout by one listener thread, so workers never wait on the
+# terminal and concurrent lines do not interleave
+log = logging.getLogger('ytdlp_opus')
+_log_listener = None
+
+class LineEndHandler(logging.StreamHandler):
+    """StreamHandler that ends each message with its 'end' extra (a newline by default)"""
+    def emit(self, record):
+        # Only the listener thread emits, so the terminator can be set per record
+        self.terminator = getattr(record, 'end', '\n')
+        super().emit(record)
+
+def setup_logging():
+    """Send log messages through a queue to stdout (once per process)"""
+    global _log_listener
+    if _log_listener is not None:
+        return
+    log_queue = queue.SimpleQueue()
+    stream_handler = LineEndHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter('%(message)s'))
+    _log_listener = QueueListener(log_queue, stream_handler)
+    log.addHandler(QueueHandler(log_queue))
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    _log_listener.start()
+    atexit.register(_log_listener.stop)  # Registered first, so it runs after the other exit handlers
+
+def flush_log():
+    """Wait until queued log messages are written, before printing directly again"""
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener.start()
 
 class UniversalAudioDownloader:
-    def __init__(self):
+    def __init__(self, max_workers: int = 4, sleep_requests: float = 0):
+        setup_logging()
+        
+        # Number of tracks downloaded at the same time; every yt-dlp download
+        # process takes a slot, however many URLs are being processed at once
+        self.max_workers = max(1, max_workers)
+        self.download_slots = threading.BoundedSemaphore(self.max_workers)
+        
+        # Set by the first Ctrl-C while downloading; no new downloads start after it
+        self.stop_requested = threading.Event()
+        
+        # Optional pause between yt-dlp's metadata requests (0 = no pause)
+        self.sleep_requests = max(0, sleep_requests)
+        
         # Set output directory to the same folder as the script
-        script_dir = Path(__file__).parent.absolute()
+        self.script_dir = script_dir = Path(__file__).parent.absolute()
         self.output_dir = script_dir / "Audio Downloads"
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # Get the Python executable path (for virtual environment)
         self.python_exe = self.get_venv_python()
         
-        # Initialize failed downloads log
+        # Initialize failed downloads log (shared by download worker threads)
         self.failed_downloads = []
         self.failed_downloads_file = script_dir / "failed_downloads.txt"
+        self.failed_downloads_lock = threading.Lock()
+        self.failed_downloads_handle = None  # Opened on the first failure
+        
+        # Log records are written by one background thread, so download workers
+        # only queue them and never wait on the file
+        self.failed_log_queue = queue.SimpleQueue()
+        self.failed_log_thread = threading.Thread(target=self.write_failed_log, daemon=True)
+        self.failed_log_thread.start()
+        atexit.register(self.close_failed_log)
+        
+        # Metadata lookups run in-process when yt-dlp is importable by this
+        # interpreter. YoutubeDL instances are not thread-safe, so each lookup
+        # borrows an idle one; they live for the whole run (keeping their
+        # connections open across URLs) and are closed at exit
+        self.in_process = yt_dlp is not None and self.python_exe == sys.executable
+        self.idle_ydls = queue.SimpleQueue()
+        self.all_ydls = []
+        atexit.register(self.close_ydls)
+        
+        # Track info and playlist listings by URL, kept on disk for METADATA_CACHE_TTL
+        # so retries and repeat runs skip the lookup
+        self.metadata_cache_file = script_dir / "metadata_cache.json"
+        self.metadata_cache_lock = threading.Lock()
+        self.metadata_cache = self.load_metadata_cache()
+        self.metadata_cache_dirty = False
+        atexit.register(self.save_metadata_cache)
         
         # Check if yt-dlp is installed in venv
         if not self.check_ytdlp_installed():
@@ -40,7 +210,7 @@ class UniversalAudioDownloader:
     
     def get_venv_python(self) -> str:
         """Get Python executable from virtual environment if it exists (silent)"""
-        script_dir = Path(__file__).parent.absolute()
+        script_dir = self.script_dir
         
         # Check for venv in common locations
         venv_paths = [
@@ -61,7 +231,7 @@ class UniversalAudioDownloader:
     
     def find_ffmpeg(self) -> Optional[str]:
         """Find ffmpeg in PATH or in script folder"""
-        script_dir = Path(__file__).parent.absolute()
+        script_dir = self.script_dir
         
         # Check in script folder first
         ffmpeg_in_script = script_dir / "ffmpeg.exe"
@@ -82,6 +252,18 @@ class UniversalAudioDownloader:
     
     def check_ytdlp_installed(self) -> bool:
         """Check if yt-dlp is installed as a Python module in venv"""
+        # Look for the package on disk first; starting an interpreter just to
+        # run --version costs a few hundred milliseconds on every launch
+        if self.python_exe == sys.executable:
+            if importlib.util.find_spec("yt_dlp") is not None:
+                return True
+        else:
+            venv_dir = Path(self.python_exe).parent.parent
+            site_packages = [venv_dir / "Lib" / "site-packages", *venv_dir.glob("lib/python*/site-packages")]
+            if any((sp / "yt_dlp" / "__init__.py").exists() for sp in site_packages):
+                return True
+        
+        # Not found where expected; ask the interpreter itself
         try:
             subprocess.run(
                 [self.python_exe, "-m", "yt_dlp", "--version"], 
@@ -133,11 +315,33 @@ class UniversalAudioDownloader:
         print("[*] • YouTube")
         print("[*] • And more...")
         print("[*] Paste any audio URL. Type 'exit' to quit.")
+        print("[*] Type 'clear_cache' to refresh cached track and playlist info.")
         print(f"[*] Downloading to: {self.output_dir}")
         if self.ffmpeg_path:
             print(f"[*] FFmpeg: Found")
         print("-" * 50)
     
+    @contextmanager
+    def stop_on_interrupt(self):
+        """While active, the first Ctrl-C stops new downloads from starting; a second one quits"""
+        def request_stop(signum, frame):
+            if self.stop_requested.is_set():
+                raise KeyboardInterrupt
+            self.stop_requested.set()
+            log.warning("\n[!] Stopping: no new downloads will start (press Ctrl-C again to quit now)")
+        
+        self.stop_requested.clear()
+        previous_handler = signal.signal(signal.SIGINT, request_stop)
+        try:
+            yield
+        finally:
+            signal.signal(signal.SIGINT, previous_handler)
+            # The stop only applies to this run; later retries (e.g. from the
+            # failed downloads summary) must still download
+            self.stop_requested.clear()
+            # Download output is queued; write it out before the caller prints again
+            flush_log()
+
     def log_failed_download(self, url: str, title: str, artist: str, error: str):
         """Log failed download to memory and file"""
         failed_entry = {
@@ -145,28 +349,67 @@ class UniversalAudioDownloader:
             'title': title,
             'artist': artist,
             'error': error,
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            'timestamp': time.strftime(LOG_TIME_FORMAT)
         }
         
-        self.failed_downloads.append(failed_entry)
+        # One JSON object per line (JSONL), so the log can be read back line by line
+        record = json.dumps(failed_entry) + "\n"
         
-        # Also log to file
-        try:
-            with open(self.failed_downloads_file, 'a', encoding='utf-8') as f:
-                f.write(f"Time: {failed_entry['timestamp']}\n")
-                f.write(f"Title: {title}\n")
-                f.write(f"Artist: {artist}\n")
-                f.write(f"URL: {url}\n")
-                f.write(f"Error: {error}\n")
-                f.write("-" * 50 + "\n\n")
-        except Exception as e:
-            print(f"[!] Failed to write to error log: {e}")
+        with self.failed_downloads_lock:
+            self.failed_downloads.append(failed_entry)
+        
+        # Also log to file, through the writer thread
+        self.failed_log_queue.put(record)
     
+    def write_failed_log(self):
+        """Write queued failure records to the log file until None is queued"""
+        for record in iter(self.failed_log_queue.get, None):
+            try:
+                if self.failed_downloads_handle is None:
+                    # Line buffered: each JSONL record reaches the file in one write,
+                    # so the log is complete even if the run is killed
+                    self.failed_downloads_handle = open(self.failed_downloads_file, 'a', encoding='utf-8', buffering=1)
+                self.failed_downloads_handle.write(record)
+            except Exception as e:
+                log.warning("[!] Failed to write to error log: %s", e)
+        
+        if self.failed_downloads_handle is not None:
+            self.failed_downloads_handle.close()
+    
+    def close_failed_log(self):
+        """Let the writer thread finish the queued records and close the log"""
+        self.failed_log_queue.put(None)
+        self.failed_log_thread.join()
+    
+    def read_failed_urls(self) -> List[str]:
+        """Return the unique URLs in the failed downloads log, in logged order"""
+        with open(self.failed_downloads_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []  # mmap cannot map an empty file
+            # Scan the mapped file with one regex instead of decoding every line
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                # dict.fromkeys drops repeats in one pass and keeps first-seen order
+                return list(dict.fromkeys(
+                    url for url in map(self.parse_failed_url, _FAILED_URL_RE.finditer(data)) if url
+                ))
+
+    @staticmethod
+    def parse_failed_url(match: "re.Match[bytes]") -> str:
+        """Get the URL from one failed downloads log match ('' if it is malformed)"""
+        if match.group(1) is not None:
+            try:
+                return json.loads(match.group(1))
+            except ValueError:
+                return ''
+        # Entry written before the log switched to JSONL
+        return match.group(2).decode('utf-8', 'replace').strip()
+
     def show_failed_downloads_summary(self, context: str = ""):
         """Show summary of failed downloads"""
         if not self.failed_downloads:
             return
         
+        flush_log()
         print("\n" + "="*60)
         print("[!] FAILED DOWNLOADS SUMMARY")
         if context:
@@ -192,10 +435,10 @@ class UniversalAudioDownloader:
     def retry_failed_downloads(self):
         """Retry all failed downloads"""
         if not self.failed_downloads:
-            print("[*] No failed downloads to retry.")
+            log.info("[*] No failed downloads to retry.")
             return
         
-        print(f"\n[*] Retrying {len(self.failed_downloads)} failed downloads...")
+        log.info("\n[*] Retrying %s failed downloads...", len(self.failed_downloads))
         
         # Create a copy of failed downloads to retry
         to_retry = self.failed_downloads.copy()
@@ -203,23 +446,30 @@ class UniversalAudioDownloader:
         
         successful_retries = 0
         
-        for failed in to_retry:
-            print(f"\n[*] Retrying: {failed['title']} - {failed['artist']}")
-            success = self.download_track(failed['url'], self.output_dir)
+        for i, failed in enumerate(to_retry):
+            if self.stop_requested.is_set():
+                # Keep the ones not attempted for a later retry
+                self.failed_downloads.extend(to_retry[i:])
+                break
+            
+            log.info("\n[*] Retrying: %s - %s", failed['title'], failed['artist'])
+            success, _ = self.download_track(failed['url'], self.output_dir)
             
             if success:
                 successful_retries += 1
-                print(f"[+] Successfully retried: {failed['title']}")
+                log.info("[+] Successfully retried: %s", failed['title'])
             else:
-                print(f"[!] Still failed: {failed['title']}")
+                log.warning("[!] Still failed: %s", failed['title'])
         
-        print(f"\n[*] Retry completed: {successful_retries}/{len(to_retry)} successful")
+        log.info("\n[*] Retry completed: %s/%s successful", successful_retries, len(to_retry))
         
         # Show remaining failures
         if self.failed_downloads:
             self.show_failed_downloads_summary("After retry")
     
-    def create_safe_filename(self, title: str, artist: str = "") -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=2048)
+    def create_safe_filename(title: str, artist: str = "") -> str:
         """Create a safe filename using title and artist"""
         if not title or title == 'Unknown':
             return "unknown_track.mp3"
@@ -230,19 +480,13 @@ class UniversalAudioDownloader:
         else:
             filename = title
         
-        # Remove invalid filename characters
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '_')
-        
-        # Remove control characters
-        filename = ''.join(char for char in filename if ord(char) >= 32)
-        
-        # Normalize unicode characters
-        filename = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+        # Normalize unicode characters down to ASCII, then replace invalid filename
+        # characters and remove control characters in one pass. Normalizing first
+        # also catches look-alikes such as a full-width colon that decompose to ':'
+        filename = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii').translate(_SANITIZE_TABLE)
         
         # Replace multiple spaces with single space
-        filename = re.sub(r'\s+', ' ', filename)
+        filename = _WS_RE.sub(' ', filename)
         
         # Trim whitespace
         filename = filename.strip()
@@ -256,24 +500,20 @@ class UniversalAudioDownloader:
         
         return filename
 
-    def create_safe_folder_name(self, name: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def create_safe_folder_name(name: str) -> str:
         """Create a safe folder name"""
         if not name or name == 'Unknown':
             return "Unknown Folder"
         
-        # Remove invalid filename characters
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            name = name.replace(char, '_')
-        
-        # Remove control characters
-        name = ''.join(char for char in name if ord(char) >= 32)
-        
-        # Normalize unicode characters
-        name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+        # Normalize unicode characters down to ASCII, then replace invalid filename
+        # characters and remove control characters in one pass. Normalizing first
+        # also catches look-alikes such as a full-width colon that decompose to ':'
+        name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii').translate(_SANITIZE_TABLE)
         
         # Replace multiple spaces with single space
-        name = re.sub(r'\s+', ' ', name)
+        name = _WS_RE.sub(' ', name)
         
         # Trim whitespace
         name = name.strip()
@@ -284,54 +524,158 @@ class UniversalAudioDownloader:
         
         return name
 
-    def detect_platform(self, url: str) -> str:
+    def load_metadata_cache(self) -> Dict[str, Dict[str, list]]:
+        """Read the metadata cache file, dropping expired entries"""
+        cache = {'tracks': {}, 'playlists': {}}
+        try:
+            with open(self.metadata_cache_file, 'rb') as f:
+                stored = json_loads(f.read())
+        except (OSError, ValueError):
+            return cache
+        
+        cutoff = time.time() - METADATA_CACHE_TTL
+        try:
+            for kind in cache:
+                cache[kind] = {
+                    url: entry for url, entry in stored.get(kind, {}).items()
+                    if entry[0] >= cutoff
+                }
+        except (AttributeError, TypeError, IndexError, KeyError):
+            # Valid JSON but not the shape written by save_metadata_cache; start empty
+            return {'tracks': {}, 'playlists': {}}
+        return cache
+
+    def save_metadata_cache(self):
+        """Write the metadata cache file if anything was added this run"""
+        with self.metadata_cache_lock:
+            if not self.metadata_cache_dirty:
+                return
+            try:
+                tmp_file = self.metadata_cache_file.with_suffix('.tmp')
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.metadata_cache, f)
+                os.replace(tmp_file, self.metadata_cache_file)
+                self.metadata_cache_dirty = False
+            except OSError as e:
+                print(f"[!] Failed to save metadata cache: {e}")
+
+    def clear_metadata_cache(self):
+        """Forget all cached track info and playlist listings"""
+        with self.metadata_cache_lock:
+            self.metadata_cache = {'tracks': {}, 'playlists': {}}
+            self.metadata_cache_dirty = False
+            try:
+                self.metadata_cache_file.unlink()
+            except FileNotFoundError:
+                pass
+        print("[*] Metadata cache cleared")
+
+    def cache_lookup(self, kind: str, url: str):
+        """Return cached 'tracks' info or 'playlists' entries for a URL, or None if missing or expired"""
+        entry = self.metadata_cache[kind].get(url)
+        if entry and time.time() - entry[0] < METADATA_CACHE_TTL:
+            return entry[1]
+        return None
+
+    def cache_store(self, kind: str, url: str, value):
+        """Remember 'tracks' info or 'playlists' entries for a URL"""
+        with self.metadata_cache_lock:
+            self.metadata_cache[kind][url] = [time.time(), value]
+            self.metadata_cache_dirty = True
+
+    def trim_info(self, info: Dict) -> Dict:
+        """Keep only the info fields the downloader uses"""
+        return {key: info[key] for key in CACHED_INFO_KEYS if key in info}
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def detect_platform(url: str) -> str:
         """Detect which platform the URL is from"""
-        url_lower = url.lower()
+        match = _PLATFORM_RE.search(url)
+        return match.lastgroup if match else 'unknown'
+
+    @contextmanager
+    def borrow_ydl(self):
+        """Lend out an idle YoutubeDL for metadata lookups, creating one if all are busy"""
+        try:
+            ydl = self.idle_ydls.get_nowait()
+        except queue.Empty:
+            ydl = yt_dlp.YoutubeDL({
+                'quiet': True,
+                'no_warnings': True,
+                'skip_download': True,
+                'noplaylist': True,
+                'sleep_interval_requests': self.sleep_requests or None
+            })
+            self.all_ydls.append(ydl)
         
-        if 'soundcloud.com' in url_lower:
-            return 'soundcloud'
-        elif 'youtube.com' in url_lower or 'youtu.be' in url_lower:
-            if 'music.youtube.com' in url_lower:
-                return 'youtube_music'
-            else:
-                return 'youtube'
-        elif 'spotify.com' in url_lower:
-            return 'spotify'
-        elif 'bandcamp.com' in url_lower:
-            return 'bandcamp'
-        elif 'vimeo.com' in url_lower:
-            return 'vimeo'
-        else:
-            return 'unknown'
+        try:
+            yield ydl
+        finally:
+            self.idle_ydls.put(ydl)
+
+    def close_ydls(self):
+        """Close every YoutubeDL created this run"""
+        while self.all_ydls:
+            try:
+                self.all_ydls.pop().close()
+            except Exception:
+                pass
+
+    def rate_limit_args(self) -> List[str]:
+        """yt-dlp options for the optional pause between requests"""
+        if self.sleep_requests:
+            return ["--sleep-requests", str(self.sleep_requests)]
+        return []
 
     def get_audio_info(self, url: str) -> Optional[Dict]:
-        """Get audio info using python -m yt_dlp --dump-json"""
+        """Get audio info, reusing info cached by this or a recent run"""
+        info = self.cache_lookup('tracks', url)
+        if info is not None:
+            return info
+        
+        info = self.fetch_audio_info(url)
+        if info:
+            info = self.trim_info(info)
+            self.cache_store('tracks', url, info)
+        return info
+
+    def fetch_audio_info(self, url: str) -> Optional[Dict]:
+        """Get audio info using yt-dlp in-process, or python -m yt_dlp --dump-json"""
+        if self.in_process:
+            try:
+                # Same JSON-safe dict --dump-json would print, without starting a process
+                with self.borrow_ydl() as ydl:
+                    return ydl.sanitize_info(ydl.extract_info(url, download=False))
+            except Exception as e:
+                log.warning("[!] Error getting audio info: %s", e)
+                return None
+        
         try:
             cmd = [
                 self.python_exe, "-m", "yt_dlp",
                 "--dump-json",
                 "--no-playlist",
+                *self.rate_limit_args(),
                 url
             ]
             
+            # Output is kept as bytes and handed straight to the JSON parser
             result = subprocess.run(
                 cmd,
                 capture_output=True,
-                text=True,
                 timeout=30
             )
             
             if result.returncode == 0:
-                return json.loads(result.stdout)
+                return json_loads(result.stdout)
             return None
                 
         except subprocess.TimeoutExpired:
-            error_msg = "Timeout while getting audio info"
-            print(f"[!] {error_msg}")
+            log.warning("[!] Timeout while getting audio info")
             return None
         except Exception as e:
-            error_msg = f"Error getting audio info: {str(e)}"
-            print(f"[!] {error_msg}")
+            log.warning("[!] Error getting audio info: %s", e)
             return None
 
     def extract_metadata(self, info: Dict, platform: str, url: str) -> Dict:
@@ -396,7 +740,7 @@ class UniversalAudioDownloader:
             return metadata
             
         except Exception as e:
-            print(f"[!] Error extracting metadata: {e}")
+            log.warning("[!] Error extracting metadata: %s", e)
             return {
                 'title': 'Unknown Title',
                 'artist': 'Unknown Artist',
@@ -437,7 +781,81 @@ class UniversalAudioDownloader:
             # Generic: Best audio in any format
             return "bestaudio"
 
-    def download_track(self, url: str, output_dir: Path) -> Tuple[bool, str]:
+    def tag_values(self, metadata: Dict, tag_names: Dict[str, str]):
+        """Yield (tag, value) for each metadata field that has a real value"""
+        for field, tag in tag_names.items():
+            value = metadata.get(field)
+            if value and value not in UNKNOWN_VALUES:
+                yield tag, str(value)
+
+    def metadata_postprocessor_args(self, metadata: Dict) -> str:
+        """Build yt-dlp --postprocessor-args that set our tags in the --embed-metadata pass"""
+        args = []
+        for tag, value in self.tag_values(metadata, FFMPEG_TAGS):
+            args += ["-metadata", f"{tag}={value}"]
+        
+        # yt-dlp adds these after its own -metadata options, so our values win
+        return "Metadata+ffmpeg_o:" + " ".join(shlex.quote(arg) for arg in args)
+
+    def tag_file(self, path: Path, metadata: Dict) -> bool:
+        """Write tags into a downloaded file in place with mutagen (only the tag block is rewritten)"""
+        try:
+            audio = mutagen.File(path, easy=True)
+            if audio is None:
+                log.warning("\n[!] Could not tag %s: unrecognized audio format", path.name)
+                return False
+            if audio.tags is None:
+                audio.add_tags()
+            for tag, value in self.tag_values(metadata, EASY_TAGS):
+                audio[tag] = value
+            audio.save()
+            return True
+        except Exception as e:
+            log.warning("\n[!] Could not tag %s: %s", path.name, e)
+            return False
+
+    def stream_ytdlp_output(self, proc: subprocess.Popen) -> deque:
+        """Show progress and post-processing lines from a running yt-dlp, wait for it and return its last lines"""
+        tail = deque(maxlen=5)
+        pending = b""
+        
+        # Read whatever is available in large chunks and split lines ourselves,
+        # rather than relying on line buffering (ignored on Windows)
+        while True:
+            chunk = proc.stdout.read1(4096)
+            if not chunk:
+                break
+            *lines, pending = _LINE_END_RE.split(pending + chunk)
+            for raw in lines:
+                line = raw.decode('utf-8', 'replace').strip()
+                if not line:
+                    continue
+                # Queued with the other download messages so they stay in order;
+                # the progress line has no newline and is redrawn in place with '\r'
+                if _PROGRESS_RE.search(line):
+                    log.info("\r%s", line, extra={'end': ''})
+                    continue  # Not kept in the tail, which is for error output
+                tail.append(line)
+                if _STAGE_RE.search(line):
+                    log.info("\n%s", line)
+        
+        if pending.strip():
+            tail.append(pending.decode('utf-8', 'replace').strip())
+        
+        proc.wait()
+        return tail
+
+    def find_downloaded_file(self, output_dir: Path, stem: str) -> Optional[Path]:
+        """Return the audio file yt-dlp wrote for an output name without extension, if any"""
+        # A direct check per known extension; a glob on the stem would treat
+        # '[' and ']' in song titles as wildcards and miss the file
+        for ext in AUDIO_EXTENSIONS:
+            candidate = output_dir / f"{stem}{ext}"
+            if candidate.exists():
+                return candidate
+        return None
+
+    def download_track(self, url: str, output_dir: Path, info: Optional[Dict] = None) -> Tuple[bool, str]:
         """Download a single track using python -m yt_dlp (NO ALBUM ART)"""
         title = "Unknown Title"
         artist = "Unknown Artist"
@@ -445,11 +863,12 @@ class UniversalAudioDownloader:
         try:
             # Detect platform
             platform = self.detect_platform(url)
-            print(f"[*] Detected platform: {platform.capitalize()}")
+            log.info("[*] Detected platform: %s", platform.capitalize())
             
-            # Get audio info
-            print("[*] Getting audio information...")
-            info = self.get_audio_info(url)
+            # Get audio info unless it was already fetched (e.g. from a playlist dump)
+            if info is None:
+                log.info("[*] Getting audio information...")
+                info = self.get_audio_info(url)
             if not info:
                 error_msg = "Failed to get audio information"
                 self.log_failed_download(url, title, artist, error_msg)
@@ -470,16 +889,16 @@ class UniversalAudioDownloader:
             # Check if file already exists
             if output_file.exists():
                 file_size = output_file.stat().st_size / (1024 * 1024)
-                print(f"[*] File already exists: {filename} ({file_size:.1f} MB)")
+                log.info("[*] File already exists: %s (%.1f MB)", filename, file_size)
                 return True, "File already exists"
             
-            print(f"[*] Downloading: {artist} - {title}")
+            log.info("[*] Downloading: %s - %s", artist, title)
             if metadata.get('quality'):
-                print(f"[*] Quality: {metadata['quality']}")
+                log.info("[*] Quality: %s", metadata['quality'])
             if metadata.get('duration'):
                 minutes = int(metadata['duration']) // 60
                 seconds = int(metadata['duration']) % 60
-                print(f"[*] Duration: {minutes}:{seconds:02d}")
+                log.info("[*] Duration: %d:%02d", minutes, seconds)
             
             # Build yt-dlp command for highest quality audio (NO ALBUM ART)
             cmd = [
@@ -489,135 +908,263 @@ class UniversalAudioDownloader:
                 "--audio-format", "mp3",
                 "--audio-quality", "0",  # Best quality
                 "--no-playlist",
-                "--embed-metadata",
+                "--no-embed-metadata" if mutagen else "--embed-metadata",
                 "--no-embed-thumbnail",  # NO ALBUM ART
                 "--no-embed-chapters",
                 "--no-embed-info-json",
-                "--add-metadata",
                 "--prefer-ffmpeg",
                 "-o", str(output_file.with_suffix('')),  # Remove extension, yt-dlp will add proper one
                 url
             ]
             
+            # Tags are written in place with mutagen after the download. Without it,
+            # they go to the --embed-metadata pass: ExtractAudio skips ffmpeg when the
+            # source is already mp3, so tags given to it would be lost
+            if not mutagen:
+                cmd[-1:-1] = ["--postprocessor-args", self.metadata_postprocessor_args(metadata)]
+            
             # Add ffmpeg location if found
             if self.ffmpeg_path:
                 cmd.extend(["--ffmpeg-location", self.ffmpeg_path])
+            cmd.extend(self.rate_limit_args())
             
-            print(f"[*] Output file: {filename}")
-            print("[*] Album art: Disabled")
-            
-            # Run download
-            proc = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
-            )
-            
-            # Stream output
-            for line in proc.stdout:
-                line = line.strip()
-                if line:
-                    if '%' in line or '[download]' in line:
-                        print(f"\r{line}", end='', flush=True)
-                    elif '[ExtractAudio]' in line or '[ffmpeg]' in line or '[Metadata]' in line:
-                        print(f"\n{line}")
-                    elif '[soundcloud]' in line.lower():
-                        print(f"\n{line}")
+            log.info("[*] Output file: %s", filename)
+            log.info("[*] Album art: Disabled")
             
-            proc.wait()
+            # Run download and stream output
+            with self.download_slots:
+                if self.stop_requested.is_set():
+                    # Logged like a failure, so a later retry still picks it up
+                    error_msg = "Stopped before download"
+                    self.log_failed_download(url, title, artist, error_msg)
+                    return False, error_msg
+                proc = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    bufsize=65536
+                )
+                tail = self.stream_ytdlp_output(proc)
             
             # Check for downloaded file (might be .mp3 or .opus or .m4a)
-            possible_files = list(output_dir.glob(f"{output_file.stem}.*"))
-            downloaded_file = None
-            for f in possible_files:
-                if f.suffix.lower() in ['.mp3', '.opus', '.m4a', '.webm', '.ogg']:
-                    downloaded_file = f
-                    break
+            downloaded_file = self.find_downloaded_file(output_dir, output_file.stem)
             
-            if proc.returncode == 0 and downloaded_file and downloaded_file.exists():
+            if proc.returncode == 0 and downloaded_file:
                 # If not already mp3, rename to mp3
                 if downloaded_file.suffix.lower() != '.mp3':
                     mp3_file = output_file.with_suffix('.mp3')
                     shutil.move(str(downloaded_file), str(mp3_file))
-                    file_size = mp3_file.stat().st_size / (1024 * 1024)
-                else:
-                    file_size = downloaded_file.stat().st_size / (1024 * 1024)
+                    downloaded_file = mp3_file
+                
+                if mutagen:
+                    self.tag_file(downloaded_file, metadata)
+                file_size = downloaded_file.stat().st_size / (1024 * 1024)
                 
-                print(f"\n[+] Download complete: {filename} ({file_size:.1f} MB)")
+                log.info("\n[+] Download complete: %s (%.1f MB)", filename, file_size)
                 return True, "Download successful"
             else:
                 error_msg = f"Download failed with code {proc.returncode}"
-                print(f"\n[!] {error_msg}")
+                if tail:
+                    error_msg += "\n" + "\n".join(tail)
+                log.warning("\n[!] %s", error_msg)
                 self.log_failed_download(url, title, artist, error_msg)
                 return False, error_msg
                 
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
-            print(f"\n[!] {error_msg}")
-            print(f"[!] Traceback: {traceback.format_exc()}")
+            log.warning("\n[!] %s", error_msg)
+            # Only the exception line; walking the stack is not worth it per failed track
+            import traceback
+            log.warning("[!] Exception: %s", ''.join(traceback.format_exception_only(type(e), e)).strip())
             self.log_failed_download(url, title, artist, error_msg)
             return False, error_msg
 
+    def download_batch(self, tracks: List[Tuple[str, Dict]], output_dir: Path, platform: str) -> int:
+        """Download several (url, info) tracks with one yt-dlp process reading URLs from stdin"""
+        successful = 0
+        pending = {}  # video id -> (url, metadata, final output file)
+        
+        for url, info in tracks:
+            metadata = self.extract_metadata(info, platform, url)
+            filename = self.create_safe_filename(metadata['title'], metadata['artist'])
+            output_file = output_dir / filename
+            
+            # Tracks already on disk were filtered out by process_playlist
+            if info.get('id'):
+                pending[info['id']] = (url, metadata, output_file)
+            elif self.download_track(url, output_dir, info)[0]:
+                # No id to map the batch output back to this track
+                successful += 1
+        
+        if not pending:
+            return successful
+        
+        log.info("[*] Downloading batch of %d tracks", len(pending))
+        
+        # Files are written as <id>.<ext> and renamed below, since the safe
+        # filenames cannot be expressed as a yt-dlp output template
+        cmd = [
+            self.python_exe, "-m", "yt_dlp",
+            "-a", "-",  # Read URLs from stdin
+            "-f", self.get_best_audio_format(platform),
+            "-x",
+            "--audio-format", "mp3",
+            "--audio-quality", "0",  # Best quality
+            "--no-playlist",
+            "--ignore-errors",
+            # With mutagen the tags are written in place after the download,
+            # instead of by an extra ffmpeg pass that copies every file
+            "--no-embed-metadata" if mutagen else "--embed-metadata",
+            "--no-embed-thumbnail",  # NO ALBUM ART
+            "--no-embed-chapters",
+            "--no-embed-info-json",
+            "--prefer-ffmpeg",
+            "-o", str(output_dir / "%(id)s.%(ext)s")
+        ]
+        
+        # Add ffmpeg location if found
+        if self.ffmpeg_path:
+            cmd.extend(["--ffmpeg-location", self.ffmpeg_path])
+        cmd.extend(self.rate_limit_args())
+        
+        try:
+            with self.download_slots:
+                if self.stop_requested.is_set():
+                    # Logged like failures, so a later retry still picks them up
+                    error_msg = "Stopped before download"
+                    log.warning("\n[!] %s: %d tracks", error_msg, len(pending))
+                    for url, metadata, _ in pending.values():
+                        self.log_failed_download(url, metadata['title'], metadata['artist'], error_msg)
+                    return successful
+                proc = subprocess.Popen(
+                    cmd,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    bufsize=65536
+                )
+                proc.stdin.write(("\n".join(url for url, _, _ in pending.values()) + "\n").encode('utf-8'))
+                proc.stdin.close()
+                
+                self.stream_ytdlp_output(proc)
+        except Exception as e:
+            error_msg = f"Unexpected error: {str(e)}"
+            log.warning("\n[!] %s", error_msg)
+            for url, metadata, _ in pending.values():
+                self.log_failed_download(url, metadata['title'], metadata['artist'], error_msg)
+            return successful
+        
+        # Map <id>.<ext> outputs back to their tracks
+        finished = []  # (final file, metadata)
+        for video_id, (url, metadata, output_file) in pending.items():
+            downloaded_file = self.find_downloaded_file(output_dir, video_id)
+            
+            if downloaded_file:
+                mp3_file = output_file.with_suffix('.mp3')
+                shutil.move(str(downloaded_file), str(mp3_file))
+                finished.append((mp3_file, metadata))
+            else:
+                error_msg = f"Download failed in batch (yt-dlp exit code {proc.returncode})"
+                log.warning("\n[!] %s: %s", metadata['title'], error_msg)
+                self.log_failed_download(url, metadata['title'], metadata['artist'], error_msg)
+        
+        # Tag the whole batch at once; files are independent, so spread them over threads
+        if mutagen and finished:
+            with ThreadPoolExecutor(max_workers=min(len(finished), os.cpu_count() or 1)) as executor:
+                list(executor.map(lambda item: self.tag_file(*item), finished))
+        
+        for mp3_file, _ in finished:
+            file_size = mp3_file.stat().st_size / (1024 * 1024)
+            log.info("\n[+] Download complete: %s (%.1f MB)", mp3_file.name, file_size)
+            successful += 1
+        
+        return successful
+
+    def fetch_playlist_entries(self, url: str) -> Tuple[List[Dict], int]:
+        """Get the info of every track in a playlist, in playlist order, and yt-dlp's exit code"""
+        # Get full info for every track in one call (one JSON object per line),
+        # so download_track does not need a metadata lookup per track
+        cmd = [
+            self.python_exe, "-m", "yt_dlp",
+            "--dump-json",
+            "--yes-playlist",
+            "--ignore-errors",
+            *self.rate_limit_args(),
+            url
+        ]
+        
+        # Each track's info is printed as soon as it is extracted, so read the dump
+        # as it arrives and show progress instead of waiting for the whole playlist.
+        # With --ignore-errors, unavailable tracks are skipped rather than failing the whole list
+        entries = []
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            for line in proc.stdout:
+                if self.stop_requested.is_set():
+                    proc.terminate()
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    # Parsed as bytes, without decoding the line to text first
+                    entries.append(self.trim_info(json_loads(line)))
+                except ValueError:
+                    continue
+                if len(entries) % 25 == 0:
+                    log.info("[*] Got info for %d tracks...", len(entries))
+        finally:
+            proc.stdout.close()
+            proc.wait()
+        
+        return entries, proc.returncode
+
     def process_playlist(self, url: str):
         """Process playlist from any platform"""
-        print(f"[*] Processing playlist: {url}")
+        log.info("[*] Processing playlist: %s", url)
         
         # Detect platform
         platform = self.detect_platform(url)
-        print(f"[*] Detected platform: {platform.capitalize()}")
+        log.info("[*] Detected platform: %s", platform.capitalize())
         
         try:
-            # Get playlist info
-            cmd = [
-                self.python_exe, "-m", "yt_dlp",
-                "--flat-playlist",
-                "--dump-single-json",
-                url
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            # Reuse a recent listing; otherwise get it (and every track's info) from yt-dlp
+            entries = self.cache_lookup('playlists', url)
+            if entries is not None:
+                log.info("[*] Using cached playlist listing (type 'clear_cache' to refresh)")
+            else:
+                log.info("[*] Getting playlist information...")
+                entries, returncode = self.fetch_playlist_entries(url)
+                # A dump cut short (Ctrl-C, network error, crash) would hide the
+                # rest of the playlist for METADATA_CACHE_TTL, so only cache complete ones
+                if entries and returncode == 0 and not self.stop_requested.is_set():
+                    self.cache_store('playlists', url, entries)
             
-            if result.returncode == 0:
-                playlist_data = json.loads(result.stdout)
-                playlist_title = playlist_data.get('title', 'Playlist')
-                
-                # For SoundCloud, entries might be in different format
-                entries = []
-                if 'entries' in playlist_data:
-                    entries = playlist_data['entries']
-                elif '_entries' in playlist_data:
-                    entries = playlist_data['_entries']
+            if entries:
+                playlist_title = entries[0].get('playlist_title') or entries[0].get('playlist') or 'Playlist'
                 
-                print(f"[*] Playlist: {playlist_title}")
-                print(f"[*] Total tracks: {len(entries)}")
+                log.info("[*] Playlist: %s", playlist_title)
+                log.info("[*] Total tracks: %s", len(entries))
                 
                 # Create playlist directory
                 safe_playlist_title = self.create_safe_folder_name(playlist_title)
                 playlist_dir = self.output_dir / safe_playlist_title
                 playlist_dir.mkdir(exist_ok=True)
                 
-                # Download each track
-                successful = 0
+                # Names already in the playlist folder, listed once so every entry
+                # is a set lookup instead of a stat (lowercase, as on Windows)
+                with os.scandir(playlist_dir) as dir_entries:
+                    existing = {dir_entry.name.lower() for dir_entry in dir_entries}
+                
+                # Collect track URLs ('url' in a full info dict is the media stream, not the page)
+                tracks = []
                 total = len(entries)
+                successful = 0
                 
                 for i, entry in enumerate(entries, 1):
-                    if not entry:
-                        print(f"[!] Skipping invalid entry {i}")
-                        continue
-                    
-                    # Get track URL
-                    if 'url' in entry:
-                        track_url = entry['url']
-                    elif 'webpage_url' in entry:
+                    if entry.get('webpage_url'):
                         track_url = entry['webpage_url']
+                    elif entry.get('original_url'):
+                        track_url = entry['original_url']
                     elif 'id' in entry:
                         # Construct URL based on platform
                         if platform == 'soundcloud':
@@ -625,128 +1172,165 @@ class UniversalAudioDownloader:
                         else:
                             track_url = f"https://youtube.com/watch?v={entry['id']}"
                     else:
-                        print(f"[!] Skipping entry {i} - no URL found")
+                        log.warning("[!] Skipping entry %s - no URL found", i)
                         continue
                     
-                    print(f"\n[*] Track {i}/{total}")
-                    
-                    success, _ = self.download_track(track_url, playlist_dir)
-                    if success:
+                    # Skip tracks that are already downloaded before starting any process
+                    metadata = self.extract_metadata(entry, platform, track_url)
+                    filename = self.create_safe_filename(metadata['title'], metadata['artist'])
+                    if filename.lower() in existing:
+                        log.info("[*] File already exists: %s", filename)
                         successful += 1
+                        continue
+                    
+                    self.cache_store('tracks', track_url, entry)
+                    tracks.append((track_url, entry))
+                
+                if tracks:
+                    # Split tracks into one batch per worker; each batch is a single
+                    # long-lived yt-dlp process, and batches run in parallel
+                    workers = min(self.max_workers, len(tracks))
+                    batches = [tracks[n::workers] for n in range(workers)]
+                    log.info("[*] Downloading %s tracks with %s parallel workers", len(tracks), workers)
                     
-                    # Small delay between downloads
-                    if i < total:
-                        time.sleep(1)
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        futures = [
+                            executor.submit(self.download_batch, batch, playlist_dir, platform)
+                            for batch in batches
+                        ]
+                        for future in as_completed(futures):
+                            successful += future.result()
+                            log.info("\n[*] Progress: %s/%s tracks downloaded", successful, total)
                 
-                print(f"\n[*] Playlist download completed!")
-                print(f"[*] Successful: {successful}/{total} tracks")
+                log.info("\n[*] Playlist download completed!")
+                log.info("[*] Successful: %s/%s tracks", successful, total)
                 
                 return successful > 0
             else:
-                print("[!] Failed to get playlist info")
+                log.warning("[!] Failed to get playlist info")
                 return False
                 
         except Exception as e:
-            print(f"[!] Error processing playlist: {e}")
+            log.warning("[!] Error processing playlist: %s", e)
             return False
 
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def is_playlist_url(url: str) -> bool:
+        """Check whether a URL points to a playlist, set or album"""
+        return _PLAYLIST_RE.search(url) is not None
+
     def process_url(self, url: str) -> bool:
         """Process URL from any platform"""
-        url_lower = url.lower()
+        if self.stop_requested.is_set():
+            return False
         
         # Check if it's a valid URL
         if not (url.startswith('http://') or url.startswith('https://')):
-            print("[*] Please provide a valid URL (starting with http:// or https://)")
+            log.info("[*] Please provide a valid URL (starting with http:// or https://)")
             return False
         
         try:
             # Check if it's a playlist
-            if any(x in url_lower for x in ['playlist', 'set/', 'album', 'list=']):
-                print("[*] Detected playlist/set/album")
+            if self.is_playlist_url(url):
+                log.info("[*] Detected playlist/set/album")
                 return self.process_playlist(url)
             else:
-                print("[*] Detected single track")
+                log.info("[*] Detected single track")
                 success, _ = self.download_track(url, self.output_dir)
                 return success
                 
         except Exception as e:
-            print(f"[!] Error processing URL: {e}")
+            log.warning("[!] Error processing URL: %s", e)
             return False
 
+def iter_urls(path: str):
+    """Yield the unique URLs in a text file one at a time, skipping blank lines and # comments"""
+    seen = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            url = line.strip()
+            if url and not url.startswith('#') and url not in seen:
+                seen.add(url)
+                yield url
+
 def main():
     parser = argparse.ArgumentParser(description='Universal Audio Downloader - Highest Quality (No Album Art)')
     parser.add_argument('url', nargs='?', help='Audio URL (YouTube Music, SoundCloud, etc.)')
     parser.add_argument('--file', '-f', help='Text file containing multiple URLs')
     parser.add_argument('--retry', '-r', action='store_true', help='Retry failed downloads from log')
+    parser.add_argument('--jobs', '-j', type=int, default=4, help='Number of tracks to download at the same time (default: 4)')
+    parser.add_argument('--clear-cache', action='store_true', help='Forget cached track info and playlist listings before starting')
+    parser.add_argument('--sleep-requests', type=float, default=0, metavar='SECONDS',
+                        help='Pause between metadata requests, if a site rate-limits you (default: no pause)')
     
     args = parser.parse_args()
     
-    downloader = UniversalAudioDownloader()
+    downloader = UniversalAudioDownloader(max_workers=args.jobs, sleep_requests=args.sleep_requests)
+    
+    if args.clear_cache:
+        downloader.clear_metadata_cache()
     
     # Check if there are existing failed downloads
     if downloader.failed_downloads_file.exists():
-        try:
-            with open(downloader.failed_downloads_file, 'r', encoding='utf-8') as f:
-                if f.read().strip():
-                    print(f"[*] Found existing failed downloads log: {downloader.failed_downloads_file}")
-        except:
-            pass
+        # Only the size is needed here; the log itself is read on --retry
+        if downloader.failed_downloads_file.stat().st_size:
+            print(f"[*] Found existing failed downloads log: {downloader.failed_downloads_file}")
     
     if args.retry:
         # Retry failed downloads from file
         if downloader.failed_downloads_file.exists():
             try:
-                with open(downloader.failed_downloads_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    if content.strip():
-                        print("[*] Loading failed downloads from log...")
-                        # Parse URLs from log
-                        urls = []
-                        lines = content.split('\n')
-                        for i, line in enumerate(lines):
-                            if line.startswith('URL: '):
-                                url = line[5:].strip()
-                                if url and url not in urls:
-                                    urls.append(url)
-                        
-                        if urls:
-                            print(f"[*] Found {len(urls)} failed downloads to retry")
-                            for url in urls:
-                                print(f"\n{'='*50}")
-                                downloader.process_url(url)
-                                print(f"{'='*50}\n")
-                        else:
-                            print("[*] No failed downloads found in log")
-                    else:
-                        print("[*] Failed downloads log is empty")
+                log.info("[*] Loading failed downloads from log...")
+                urls = downloader.read_failed_urls()
+                
+                if urls:
+                    log.info("[*] Found %s failed downloads to retry", len(urls))
+                    with downloader.stop_on_interrupt():
+                        for url in urls:
+                            if downloader.stop_requested.is_set():
+                                break
+                            log.info("\n%s", "=" * 50)
+                            downloader.process_url(url)
+                            log.info("%s\n", "=" * 50)
+                else:
+                    log.info("[*] No failed downloads found in log")
             except Exception as e:
-                print(f"[!] Error reading failed downloads log: {e}")
+                log.warning("[!] Error reading failed downloads log: %s", e)
         else:
-            print("[*] No failed downloads log found")
+            log.info("[*] No failed downloads log found")
         return
     
     if args.file:
         # Process multiple URLs from a file
         try:
-            with open(args.file, 'r', encoding='utf-8') as f:
-                urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+            # URLs are processed side by side; the downloads they start share
+            # the --jobs download slots, so yt-dlp processes stay bounded
+            workers = min(downloader.max_workers, MAX_URL_WORKERS)
+            log.info("[*] Processing with %s parallel workers", workers)
             
-            print(f"[*] Found {len(urls)} URLs in file")
-            
-            for i, url in enumerate(urls, 1):
-                print(f"\n{'='*50}")
-                print(f"[*] URL {i}/{len(urls)}")
-                print(f"{'='*50}")
-                downloader.process_url(url)
+            with downloader.stop_on_interrupt(), ThreadPoolExecutor(max_workers=workers) as executor:
+                # Each URL is submitted as soon as its line is read, so the first
+                # download starts before the rest of the file is read
+                futures = {executor.submit(downloader.process_url, url): url for url in iter_urls(args.file)}
+                log.info("[*] Found %s URLs in file", len(futures))
+                
+                for i, future in enumerate(as_completed(futures), 1):
+                    if future.result():
+                        status = "done"
+                    else:
+                        status = "stopped" if downloader.stop_requested.is_set() else "failed"
+                    log.info("\n[*] URL %s/%s %s: %s", i, len(futures), status, futures[future])
                 
         except FileNotFoundError:
-            print(f"[!] File not found: {args.file}")
+            log.warning("[!] File not found: %s", args.file)
         except Exception as e:
-            print(f"[!] Error processing file: {e}")
+            log.warning("[!] Error processing file: %s", e)
     
     elif args.url:
         # Process a single URL
-        downloader.process_url(args.url)
+        with downloader.stop_on_interrupt():
+            downloader.process_url(args.url)
         
         # Show failed downloads summary
         if downloader.failed_downloads:
@@ -770,18 +1354,25 @@ def main():
                     downloader.clear_screen()
                     continue
                 
+                if url.lower() == 'clear_cache':
+                    downloader.clear_metadata_cache()
+                    continue
+                
                 if url.lower() == 'failed':
                     downloader.show_failed_downloads_summary()
                     continue
                 
                 if url.lower() == 'retry':
-                    downloader.retry_failed_downloads()
+                    with downloader.stop_on_interrupt():
+                        downloader.retry_failed_downloads()
                     continue
                 
                 if not url:
                     continue
                 
-                downloader.process_url(url)
+                # Ctrl-C here finishes cleanly; at the prompt it still exits
+                with downloader.stop_on_interrupt():
+                    downloader.process_url(url)
                 
             except KeyboardInterrupt:
                 print("\n[*] Exiting...")